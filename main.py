@@ -1,13 +1,26 @@
 # ============== IMPORTS ==============
-from tkinter import *
-from tkinter import messagebox, ttk
+from tkinter import (
+    Tk, Toplevel, Frame, Label, Canvas, Button, Checkbutton, Listbox,
+    Scrollbar, PhotoImage, BooleanVar,
+    CENTER, LEFT, RIGHT, Y, BOTH, END, DISABLED, NORMAL, SINGLE
+)
+from tkinter import messagebox
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import os
 import random
 import threading
+import webbrowser
+from urllib.parse import quote as urlquote
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-import pyperclip  
+try:
+    import orjson  # Optional, faster JSON encoding/decoding
+except ImportError:
+    orjson = None
 
 # ============== CONFIGURATION ==============
 class Config:
@@ -19,11 +32,18 @@ class Config:
     
     # Files
     FAVORITES_FILE = DATA_DIR / "favorites.json"
-    HISTORY_FILE = DATA_DIR / "history.json"
+    HISTORY_FILE = DATA_DIR / "history.ndjson"  # Append-only, one entry per line
+    LEGACY_HISTORY_FILE = DATA_DIR / "history.json"
+    HISTORY_LIMIT = 50  # Keep last N quotes
     
     # API
     API_URL = "https://api.kanye.rest"
-    API_TIMEOUT = 10  # seconds
+    API_TIMEOUT = 10  # seconds, per attempt
+    API_RETRIES = 2
+    API_BACKOFF = 0.3  # seconds, doubled on each retry
+    
+    # Sharing
+    TWITTER_INTENT = "https://twitter.com/intent/tweet?text="
     
     # UI
     WINDOW_PADDING = 50
@@ -44,7 +64,7 @@ class Config:
     STATS_FONT = ("Arial", 9)
     
     # Fallback quotes (when API is unavailable)
-    FALLBACK_QUOTES = [
+    FALLBACK_QUOTES = (
         "I'm not a businessman, I'm a business, man!",
         "I refuse to accept other people's ideas of happiness for me.",
         "Everything I'm not made me everything I am.",
@@ -59,7 +79,22 @@ class Config:
         "I feel calm but energized.",
         "I'm on the pursuit of awesomeness.",
         "Would you believe in what you believe in if you were the only one who believed it?"
-    ]
+    )
+
+
+# ============== JSON HELPERS ==============
+def dumps_json(data) -> bytes:
+    """Serialize data to a single line of compact UTF-8 JSON"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def loads_json(raw: bytes):
+    """Parse JSON from bytes"""
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 # ============== QUOTE MANAGER ==============
@@ -67,10 +102,16 @@ class QuoteManager:
     """Manages quotes, history, and favorites"""
     
     def __init__(self):
-        self.history = []
+        self.history = deque(maxlen=Config.HISTORY_LIMIT)
+        self.quotes_viewed = 0  # Includes quotes already evicted from history
         self.favorites = []
+        self._fav_set = set()  # Fast membership lookups for favorites
+        self.favorites_version = 0  # Bumped whenever favorites change
         self.current_quote = ""
+        self._rng = random.Random()
         self._load_data()
+        self._compact_history()
+        self._hist_fp = self._open_history_log()
     
     def _load_data(self):
         """Load saved data from files"""
@@ -79,31 +120,73 @@ class QuoteManager:
         # Load favorites
         if Config.FAVORITES_FILE.exists():
             try:
-                with open(Config.FAVORITES_FILE, 'r') as f:
-                    self.favorites = json.load(f)
+                with open(Config.FAVORITES_FILE, 'rb') as f:
+                    # Drop duplicates so the list and set stay in sync
+                    self.favorites = list(dict.fromkeys(loads_json(f.read())))
             except:
                 self.favorites = []
+            self._fav_set = set(self.favorites)
         
-        # Load history
+        # Load history (only the last N lines of the log are kept)
         if Config.HISTORY_FILE.exists():
             try:
-                with open(Config.HISTORY_FILE, 'r') as f:
-                    self.history = json.load(f)
+                with open(Config.HISTORY_FILE, 'rb') as f:
+                    lines = deque(f, maxlen=Config.HISTORY_LIMIT)
             except:
-                self.history = []
+                lines = []
+            for line in lines:
+                try:
+                    self.history.append(loads_json(line))
+                except ValueError:
+                    pass  # Skip partially written lines
+        elif Config.LEGACY_HISTORY_FILE.exists():
+            try:
+                with open(Config.LEGACY_HISTORY_FILE, 'rb') as f:
+                    self.history = deque(loads_json(f.read()), maxlen=Config.HISTORY_LIMIT)
+            except:
+                self.history = deque(maxlen=Config.HISTORY_LIMIT)
+        self.quotes_viewed = len(self.history)
     
-    def save_data(self):
-        """Save data to files"""
+    def _write_atomic(self, path: Path, payload: bytes):
+        """Atomically replace a file's contents"""
+        Config.DATA_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    
+    def _compact_history(self):
+        """Rewrite the history log with only the entries kept in memory"""
         try:
-            Config.DATA_DIR.mkdir(parents=True, exist_ok=True)
-            
-            with open(Config.FAVORITES_FILE, 'w') as f:
-                json.dump(self.favorites, f, indent=2)
-            
-            with open(Config.HISTORY_FILE, 'w') as f:
-                json.dump(self.history[-50:], f, indent=2)  # Keep last 50
+            payload = b"".join(dumps_json(entry) for entry in self.history)
+            self._write_atomic(Config.HISTORY_FILE, payload)
+        except Exception as e:
+            print(f"Error compacting history: {e}")
+    
+    def _open_history_log(self):
+        """Open the history log for appending"""
+        try:
+            return open(Config.HISTORY_FILE, 'ab', buffering=0)
+        except Exception as e:
+            print(f"Error opening history: {e}")
+            return None
+    
+    def save_favorites(self):
+        """Save favorites to file"""
+        try:
+            self._write_atomic(Config.FAVORITES_FILE, dumps_json(self.favorites))
         except Exception as e:
-            print(f"Error saving data: {e}")
+            print(f"Error saving favorites: {e}")
+    
+    def save_data(self):
+        """Save all data to files (history is appended as it happens)"""
+        self.save_favorites()
+    
+    def close(self):
+        """Close the history log"""
+        if self._hist_fp:
+            self._hist_fp.close()
+            self._hist_fp = None
     
     def add_to_history(self, quote: str):
         """Add quote to history"""
@@ -112,26 +195,47 @@ class QuoteManager:
             "timestamp": datetime.now().isoformat()
         }
         self.history.append(entry)
+        self.quotes_viewed += 1
         self.current_quote = quote
+        
+        if self._hist_fp:
+            try:
+                self._hist_fp.write(dumps_json(entry))
+            except OSError as e:
+                print(f"Error saving history: {e}")
     
     def toggle_favorite(self, quote: str) -> bool:
         """Toggle favorite status, returns True if added"""
-        if quote in self.favorites:
-            self.favorites.remove(quote)
-            return False
-        else:
+        added = quote not in self._fav_set
+        if added:
+            self._fav_set.add(quote)
             self.favorites.append(quote)
-            return True
+        else:
+            self._fav_set.discard(quote)
+            self.favorites.remove(quote)  # O(n), but only on user toggles
+        self.favorites_version += 1
+        return added
+    
+    def remove_favorite(self, quote: str):
+        """Remove quote from favorites"""
+        if quote in self._fav_set:
+            self._fav_set.discard(quote)
+            self.favorites.remove(quote)
+            self.favorites_version += 1
     
     def is_favorite(self, quote: str) -> bool:
         """Check if quote is in favorites"""
-        return quote in self.favorites
+        return quote in self._fav_set
     
     def get_random_favorite(self) -> str:
         """Get a random favorite quote"""
         if self.favorites:
-            return random.choice(self.favorites)
+            return self._rng.choice(self.favorites)
         return ""
+    
+    def get_fallback_quote(self) -> str:
+        """Get a random built-in quote for when the API is unavailable"""
+        return self._rng.choice(Config.FALLBACK_QUOTES)
 
 
 # ============== MAIN APPLICATION ==============
@@ -151,10 +255,38 @@ class KanyeQuoteApp:
         # Initialize quote manager
         self.quote_manager = QuoteManager()
         
+        # HTTP session (keeps the connection to the API alive between quotes)
+        self.http = requests.Session()
+        self.http.headers.update({
+            "User-Agent": "KanyeSays/1.0",
+            "Accept": "application/json"
+        })
+        retry = Retry(
+            total=Config.API_RETRIES,
+            backoff_factor=Config.API_BACKOFF,
+            read=False,  # Let read timeouts surface as Timeout, not retried
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"])
+        )
+        self.http.mount("https://", HTTPAdapter(
+            max_retries=retry,
+            pool_connections=1,
+            pool_maxsize=4
+        ))
+        
         # State
         self.is_loading = False
         self.auto_refresh = False
         self.auto_refresh_id = None
+        self._last_fav_state = None  # (quote, is_favorite) last drawn
+        self._has_quote = False
+        self._clipboard_fn = None  # Resolved on first copy
+        self._flash_after_id = None
+        self._fav_window = None  # Reused favorites Toplevel
+        self._fav_listbox = None
+        self._fav_list_version = None  # favorites_version shown in the listbox
+        self._pending_ui = {}  # UI updates waiting for the next idle flush
+        self._ui_scheduled = False
         
         # Setup UI
         self._setup_ui()
@@ -288,6 +420,7 @@ class KanyeQuoteApp:
             fg="white",
             padx=10,
             pady=5,
+            state=DISABLED,  # Enabled once the first quote arrives
             command=self.toggle_favorite
         )
         self.fav_button.pack(side=LEFT, padx=5)
@@ -301,6 +434,7 @@ class KanyeQuoteApp:
             fg="white",
             padx=10,
             pady=5,
+            state=DISABLED,  # Enabled once the first quote arrives
             command=self.copy_quote
         )
         self.copy_button.pack(side=LEFT, padx=5)
@@ -314,6 +448,7 @@ class KanyeQuoteApp:
             fg="white",
             padx=10,
             pady=5,
+            state=DISABLED,  # Enabled once the first quote arrives
             command=self.share_quote
         )
         self.share_button.pack(side=LEFT, padx=5)
@@ -375,20 +510,40 @@ class KanyeQuoteApp:
     
     def _setup_keyboard_shortcuts(self):
         """Setup keyboard bindings"""
-        self.window.bind("<space>", lambda e: self.get_quote())
-        self.window.bind("<Return>", lambda e: self.get_quote())
-        self.window.bind("<f>", lambda e: self.toggle_favorite())
-        self.window.bind("<F>", lambda e: self.toggle_favorite())
-        self.window.bind("<c>", lambda e: self.copy_quote())
-        self.window.bind("<C>", lambda e: self.copy_quote())
-        self.window.bind("<Escape>", lambda e: self.quit_app())
+        self._key_map = {
+            "space": self.get_quote,
+            "return": self.get_quote,
+            "f": self.toggle_favorite,
+            "c": self.copy_quote,
+            "escape": self.quit_app
+        }
+        self._quote_keys = {"f", "c"}  # Need a quote on screen
+        self.window.bind("<Key>", self._on_key)
+    
+    def _on_key(self, event):
+        """Dispatch a keypress to its shortcut handler"""
+        keysym = event.keysym.lower()
+        handler = self._key_map.get(keysym)
+        if handler is None:
+            return
+        if keysym in self._quote_keys and not self._has_quote:
+            return
+        handler()
     
     def _get_stats_text(self) -> str:
         """Get statistics text"""
-        total_quotes = len(self.quote_manager.history)
+        total_quotes = self.quote_manager.quotes_viewed
         total_favorites = len(self.quote_manager.favorites)
         return f"📊 Quotes viewed: {total_quotes} | ❤️ Favorites: {total_favorites}"
     
+    def _mark_has_quote(self):
+        """Enable quote actions once the first quote is shown"""
+        if self._has_quote:
+            return
+        self._has_quote = True
+        for button in (self.fav_button, self.copy_button, self.share_button):
+            button.config(state=NORMAL)
+    
     def _update_stats(self):
         """Update statistics display"""
         self.stats_label.config(text=self._get_stats_text())
@@ -397,16 +552,42 @@ class KanyeQuoteApp:
         """Show or hide loading indicator"""
         self.is_loading = show
         if show:
-            self.canvas.itemconfig(self.quote_text, text="")
-            self.canvas.itemconfig(self.loading_text, text="⏳ Loading...")
-            self.quote_button.config(state=DISABLED)
+            self._queue_ui(quote="", loading="⏳ Loading...", button_state=DISABLED)
         else:
-            self.canvas.itemconfig(self.loading_text, text="")
-            self.quote_button.config(state=NORMAL)
+            self._queue_ui(loading="", button_state=NORMAL)
+    
+    def _queue_ui(self, **updates):
+        """Queue UI updates to be applied together when Tk is idle"""
+        self._pending_ui.update(updates)
+        if not self._ui_scheduled:
+            self._ui_scheduled = True
+            self.window.after_idle(self._flush_ui)
+    
+    def _flush_ui(self):
+        """Apply all queued UI updates in one pass"""
+        self._ui_scheduled = False
+        pending, self._pending_ui = self._pending_ui, {}
+        
+        if "quote" in pending:
+            self.canvas.itemconfig(self.quote_text, text=pending["quote"])
+        if "loading" in pending:
+            self.canvas.itemconfig(self.loading_text, text=pending["loading"])
+        if "button_state" in pending:
+            self.quote_button.config(state=pending["button_state"])
+        if pending.get("favorite"):
+            self._update_favorite_indicator()
+        if pending.get("stats"):
+            self._update_stats()
     
     def _update_favorite_indicator(self):
         """Update the favorite indicator"""
-        if self.quote_manager.is_favorite(self.quote_manager.current_quote):
+        quote = self.quote_manager.current_quote
+        state = (quote, self.quote_manager.is_favorite(quote))
+        if state == self._last_fav_state:
+            return
+        self._last_fav_state = state
+        
+        if state[1]:
             self.canvas.itemconfig(self.favorite_indicator, text="❤️")
             self.fav_button.config(text="💔 Unfavorite", bg="#888888")
         else:
@@ -428,12 +609,12 @@ class KanyeQuoteApp:
         self.window.after(0, lambda: self._show_loading(True))
         
         try:
-            response = requests.get(
+            response = self.http.get(
                 Config.API_URL,
                 timeout=Config.API_TIMEOUT
             )
             response.raise_for_status()
-            data = response.json()
+            data = loads_json(response.content)  # Skips requests' charset sniffing
             quote = data.get("quote", "")
             
             if quote:
@@ -453,23 +634,19 @@ class KanyeQuoteApp:
         """Display the quote on canvas"""
         self._show_loading(False)
         
-        # Animate text appearance
-        self.canvas.itemconfig(self.quote_text, text=f'"{quote}"')
-        
         # Add to history
         self.quote_manager.add_to_history(quote)
-        self.quote_manager.save_data()
         
         # Update UI
-        self._update_favorite_indicator()
-        self._update_stats()
+        self._queue_ui(quote=f'"{quote}"', favorite=True, stats=True)
+        self._mark_has_quote()
     
     def _handle_error(self, error_type: str):
         """Handle API errors with fallback"""
         self._show_loading(False)
         
         # Get fallback quote
-        fallback = random.choice(Config.FALLBACK_QUOTES)
+        fallback = self.quote_manager.get_fallback_quote()
         
         if error_type == "timeout":
             msg = "API timeout - here's a saved quote:"
@@ -478,10 +655,9 @@ class KanyeQuoteApp:
         else:
             msg = "Error occurred - here's a saved quote:"
         
-        self.canvas.itemconfig(self.quote_text, text=f'"{fallback}"')
         self.quote_manager.add_to_history(fallback)
-        self._update_favorite_indicator()
-        self._update_stats()
+        self._queue_ui(quote=f'"{fallback}"', favorite=True, stats=True)
+        self._mark_has_quote()
         
         # Show subtle notification
         print(f"⚠️ {msg}")
@@ -493,9 +669,12 @@ class KanyeQuoteApp:
             return
         
         is_added = self.quote_manager.toggle_favorite(quote)
-        self.quote_manager.save_data()
+        self.quote_manager.save_favorites()
+        self._last_fav_state = None
         self._update_favorite_indicator()
         self._update_stats()
+        if self._fav_window and self._fav_window.winfo_viewable():
+            self._refresh_favorites_list()
         
         # Visual feedback
         if is_added:
@@ -505,11 +684,15 @@ class KanyeQuoteApp:
     
     def _flash_message(self, message: str):
         """Show a temporary message"""
-        original_text = self.canvas.itemcget(self.loading_text, 'text')
+        if self._flash_after_id:
+            self.window.after_cancel(self._flash_after_id)
         self.canvas.itemconfig(self.loading_text, text=message)
-        self.window.after(1500, lambda: self.canvas.itemconfig(
-            self.loading_text, text=""
-        ))
+        self._flash_after_id = self.window.after(1500, self._clear_flash_message)
+    
+    def _clear_flash_message(self):
+        """Clear the temporary message"""
+        self._flash_after_id = None
+        self.canvas.itemconfig(self.loading_text, text="")
     
     def copy_quote(self):
         """Copy current quote to clipboard"""
@@ -519,17 +702,41 @@ class KanyeQuoteApp:
         
         full_quote = f'"{quote}" - Kanye West'
         
+        if self._clipboard_fn is None:
+            self._clipboard_fn = self._resolve_clipboard()
+        
         try:
-            pyperclip.copy(full_quote)
+            self._clipboard_fn(full_quote)
             self._flash_message("📋 Copied to clipboard!")
+            return
         except:
-            # Fallback for systems without pyperclip
+            pass
+        
+        # pyperclip stopped working; switch to Tk's clipboard for good
+        if self._clipboard_fn != self._tk_copy:
+            self._clipboard_fn = self._tk_copy
             try:
-                self.window.clipboard_clear()
-                self.window.clipboard_append(full_quote)
+                self._tk_copy(full_quote)
                 self._flash_message("📋 Copied to clipboard!")
+                return
             except:
-                self._flash_message("❌ Could not copy")
+                pass
+        self._flash_message("❌ Could not copy")
+    
+    def _resolve_clipboard(self):
+        """Pick a clipboard backend: pyperclip if usable, else Tk's clipboard"""
+        try:
+            import pyperclip
+            pyperclip.paste()  # Raises if no clipboard mechanism is available
+            return pyperclip.copy
+        except Exception:
+            # Fallback for systems without pyperclip
+            return self._tk_copy
+    
+    def _tk_copy(self, text: str):
+        """Copy text using Tk's clipboard"""
+        self.window.clipboard_clear()
+        self.window.clipboard_append(text)
     
     def share_quote(self):
         """Open Twitter to share the quote"""
@@ -537,18 +744,12 @@ class KanyeQuoteApp:
         if not quote:
             return
         
-        import webbrowser
-        import urllib.parse
-        
         tweet_text = f'"{quote}" - Kanye West #KanyeSays'
-        encoded_text = urllib.parse.quote(tweet_text)
-        twitter_url = f"https://twitter.com/intent/tweet?text={encoded_text}"
-        
-        webbrowser.open(twitter_url)
+        webbrowser.open(Config.TWITTER_INTENT + urlquote(tweet_text))
         self._flash_message("🐦 Opening Twitter...")
     
     def show_favorites(self):
-        """Show favorites in a new window"""
+        """Show favorites window (reused between openings)"""
         if not self.quote_manager.favorites:
             messagebox.showinfo(
                 "No Favorites",
@@ -557,11 +758,33 @@ class KanyeQuoteApp:
             )
             return
         
-        # Create favorites window
+        if not (self._fav_window and self._fav_window.winfo_exists()):
+            self._build_favorites_window()
+        
+        self._refresh_favorites_list()
+        self._fav_window.deiconify()
+        self._fav_window.lift()
+    
+    def _refresh_favorites_list(self):
+        """Repopulate the favorites listbox if favorites changed"""
+        version = self.quote_manager.favorites_version
+        if version == self._fav_list_version:
+            return
+        
+        self._fav_listbox.delete(0, END)
+        self._fav_listbox.insert(END, *[
+            f"{i}. {quote}"
+            for i, quote in enumerate(self.quote_manager.favorites, 1)
+        ])
+        self._fav_list_version = version
+    
+    def _build_favorites_window(self):
+        """Create the favorites window"""
         fav_window = Toplevel(self.window)
         fav_window.title("⭐ Favorite Quotes")
         fav_window.config(bg=Config.BG_COLOR, padx=20, pady=20)
         fav_window.geometry("500x400")
+        fav_window.protocol("WM_DELETE_WINDOW", fav_window.withdraw)
         
         # Title
         Label(
@@ -591,9 +814,6 @@ class KanyeQuoteApp:
         listbox.pack(side=LEFT, fill=BOTH, expand=True)
         scrollbar.config(command=listbox.yview)
         
-        for i, quote in enumerate(self.quote_manager.favorites, 1):
-            listbox.insert(END, f"{i}. {quote}")
-        
         # Button frame
         btn_frame = Frame(fav_window, bg=Config.BG_COLOR)
         btn_frame.pack(pady=10)
@@ -604,16 +824,16 @@ class KanyeQuoteApp:
                 index = selection[0]
                 quote = self.quote_manager.favorites[index]
                 self._display_quote(quote)
-                fav_window.destroy()
+                fav_window.withdraw()
         
         def remove_selected():
             selection = listbox.curselection()
             if selection:
                 index = selection[0]
                 quote = self.quote_manager.favorites[index]
-                self.quote_manager.favorites.remove(quote)
-                self.quote_manager.save_data()
-                listbox.delete(index)
+                self.quote_manager.remove_favorite(quote)
+                self.quote_manager.save_favorites()
+                self._refresh_favorites_list()
                 self._update_stats()
         
         Button(
@@ -639,8 +859,12 @@ class KanyeQuoteApp:
             fg="white",
             command=lambda: self._display_quote(
                 self.quote_manager.get_random_favorite()
-            ) or fav_window.destroy()
+            ) or fav_window.withdraw()
         ).pack(side=LEFT, padx=5)
+        
+        self._fav_window = fav_window
+        self._fav_listbox = listbox
+        self._fav_list_version = None
     
     def _toggle_auto_refresh(self):
         """Toggle auto-refresh feature"""
@@ -651,8 +875,17 @@ class KanyeQuoteApp:
     
     def _start_auto_refresh(self):
         """Start auto-refresh timer"""
-        self.get_quote()
-        self.auto_refresh_id = self.window.after(10000, self._start_auto_refresh)
+        self._stop_auto_refresh()
+        self._auto_refresh_tick()
+    
+    def _auto_refresh_tick(self):
+        """Fetch a quote (unless one is in flight) and re-arm the timer"""
+        if not self.auto_refresh_var.get():
+            self.auto_refresh_id = None
+            return
+        if not self.is_loading:
+            self.get_quote()
+        self.auto_refresh_id = self.window.after(10000, self._auto_refresh_tick)
     
     def _stop_auto_refresh(self):
         """Stop auto-refresh timer"""
@@ -664,6 +897,8 @@ class KanyeQuoteApp:
         """Clean quit"""
         self._stop_auto_refresh()
         self.quote_manager.save_data()
+        self.quote_manager.close()
+        self.http.close()
         self.window.quit()
     
     def run(self):